@@ -7,7 +7,7 @@ from services.json_response_handler import JSONResponseHandler
 from services.semantic_evaluator import SemanticEvaluator
 from services.semantic_patcher import SemanticPatcher
 from .developer_agent_helpers import create_semantic_patch_prompt
-from services.patch_validator import PatchValidator
+from services.patch_validator import PatchValidator, CHANGE_LINE_PATTERN
 from typing import Dict, Any, Optional
 import json
 import asyncio
@@ -291,10 +291,11 @@ CRITICAL:
         try:
             patch_content = patch_data.get('patch_content', '')
             
-            # Count actual changes (not context lines)
-            add_lines = patch_content.count('\n+')
-            remove_lines = patch_content.count('\n-')
-            total_changes = add_lines + remove_lines
+            # Count actual changes (not context lines) in a single scan
+            change_markers = CHANGE_LINE_PATTERN.findall(patch_content)
+            total_changes = len(change_markers)
+            add_lines = change_markers.count('+')
+            remove_lines = total_changes - add_lines
             
             # Check for massive hunks
             if total_changes > self.max_hunk_size * 2:  # Allow some flexibility
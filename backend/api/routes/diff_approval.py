@@ -18,7 +18,7 @@ async def set_approval_decision(approval: ApprovalDecision):
         from services.patch_service import PatchService
         patch_service = PatchService()
         
-        success = patch_service.set_approval_decision(
+        success = await patch_service.set_approval_decision(
             approval.workspace_id, 
             approval.decision
         )
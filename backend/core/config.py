@@ -93,6 +93,12 @@ class Config:
         # File Selection Configuration
         self.max_source_files = int(os.getenv("MAX_SOURCE_FILES", "5"))
         
+        # Patch Application Configuration
+        self.shadow_validation_concurrency = int(os.getenv("SHADOW_VALIDATION_CONCURRENCY", "4"))
+        self.patch_file_concurrency = int(os.getenv("PATCH_FILE_CONCURRENCY", "4"))
+        self.file_fetch_concurrency = int(os.getenv("FILE_FETCH_CONCURRENCY", "10"))
+        self.max_patch_size = int(os.getenv("MAX_PATCH_SIZE", "1000000"))  # Characters of patch_content
+        
         # Priority Scoring Configuration
         self.priority_weights = {
             "critical": float(os.getenv("PRIORITY_CRITICAL_WEIGHT", "1.0")),
@@ -4,8 +4,16 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import logging
 
+try:
+    from diff_match_patch import diff_match_patch
+except ImportError:  # Large files fall back to difflib.SequenceMatcher
+    diff_match_patch = None
+
 logger = logging.getLogger(__name__)
 
+DIFF_CONTEXT_LINES = 3
+LARGE_DIFF_THRESHOLD = 100_000  # Characters above which diff-match-patch is used when available
+
 @dataclass
 class DiffHunk:
     """Represents a hunk of changes in a diff."""
@@ -129,37 +137,124 @@ class DiffPresenter:
         original_lines = original.splitlines(keepends=True)
         patched_lines = patched.splitlines(keepends=True)
         
-        # Use difflib to generate unified diff
-        diff_lines = list(difflib.unified_diff(
-            original_lines,
-            patched_lines,
-            fromfile=f"a/{file_path}",
-            tofile=f"b/{file_path}",
-            n=3,  # 3 lines of context
-            lineterm=""
-        ))
+        use_dmp = diff_match_patch is not None and max(len(original), len(patched)) > LARGE_DIFF_THRESHOLD
         
         hunks = []
-        current_hunk = None
-        
-        for line in diff_lines:
-            if line.startswith('@@'):
-                # New hunk header
-                if current_hunk:
-                    hunks.append(current_hunk)
-                
-                current_hunk = self._parse_hunk_header(line)
-                
-            elif current_hunk and (line.startswith(' ') or line.startswith('+') or line.startswith('-')):
-                # Hunk content line
-                self._add_line_to_hunk(current_hunk, line)
-        
-        # Add the last hunk
-        if current_hunk:
-            hunks.append(current_hunk)
+        for group in self._grouped_opcodes(original_lines, patched_lines, DIFF_CONTEXT_LINES, use_dmp):
+            _, old_first, _, new_first, _ = group[0]
+            _, _, old_last, _, new_last = group[-1]
+            old_count = old_last - old_first
+            new_count = new_last - new_first
+            
+            # Same numbering as unified diff headers: 1-based, or the preceding line for empty ranges
+            hunk = DiffHunk(
+                old_start=old_first + 1 if old_count else old_first,
+                old_count=old_count,
+                new_start=new_first + 1 if new_count else new_first,
+                new_count=new_count,
+                lines=[],
+                context=""
+            )
+            
+            for tag, i1, i2, j1, j2 in group:
+                if tag == 'equal':
+                    for line in original_lines[i1:i2]:
+                        self._add_line_to_hunk(hunk, ' ' + line)
+                    continue
+                for line in original_lines[i1:i2]:
+                    self._add_line_to_hunk(hunk, '-' + line)
+                for line in patched_lines[j1:j2]:
+                    self._add_line_to_hunk(hunk, '+' + line)
+            
+            hunks.append(hunk)
         
         return hunks
     
+    def _grouped_opcodes(self, original_lines: List[str], patched_lines: List[str], context: int, use_dmp: bool = False) -> List[List[Tuple[str, int, int, int, int]]]:
+        """Group difflib opcodes into hunks, only running the matcher over the changed middle region."""
+        # Unchanged leading/trailing lines never need matching, which keeps small edits to large files cheap
+        max_common = min(len(original_lines), len(patched_lines))
+        prefix = 0
+        while prefix < max_common and original_lines[prefix] == patched_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < max_common - prefix and original_lines[-1 - suffix] == patched_lines[-1 - suffix]:
+            suffix += 1
+        
+        original_end = len(original_lines) - suffix
+        patched_end = len(patched_lines) - suffix
+        original_middle = original_lines[prefix:original_end]
+        patched_middle = patched_lines[prefix:patched_end]
+        if use_dmp:
+            middle_opcodes = self._dmp_opcodes(original_middle, patched_middle)
+        else:
+            middle_opcodes = difflib.SequenceMatcher(None, original_middle, patched_middle).get_opcodes()
+        
+        opcodes = [('equal', 0, prefix, 0, prefix)] if prefix else []
+        opcodes.extend(
+            (tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix)
+            for tag, i1, i2, j1, j2 in middle_opcodes
+        )
+        if suffix:
+            opcodes.append(('equal', original_end, len(original_lines), patched_end, len(patched_lines)))
+        
+        # Split on long equal runs, keeping `context` lines on each side (as difflib.unified_diff does)
+        groups = []
+        group = []
+        last = len(opcodes) - 1
+        for index, (tag, i1, i2, j1, j2) in enumerate(opcodes):
+            if tag == 'equal':
+                if index == 0:
+                    i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+                if index == last:
+                    i2, j2 = min(i2, i1 + context), min(j2, j1 + context)
+                if i2 - i1 > 2 * context:
+                    group.append((tag, i1, i1 + context, j1, j1 + context))
+                    groups.append(group)
+                    group = []
+                    i1, j1 = i2 - context, j2 - context
+            group.append((tag, i1, i2, j1, j2))
+        if group and not (len(group) == 1 and group[0][0] == 'equal'):
+            groups.append(group)
+        
+        return groups
+    
+    def _dmp_opcodes(self, original_lines: List[str], patched_lines: List[str]) -> List[Tuple[str, int, int, int, int]]:
+        """Line-level opcodes from diff-match-patch, which avoids SequenceMatcher blowups on large rewrites."""
+        # Encode each distinct line as one character so the diff runs in line space
+        line_codes: Dict[str, str] = {}
+        
+        def encode(lines: List[str]) -> str:
+            return ''.join(line_codes.setdefault(line, chr(len(line_codes))) for line in lines)
+        
+        dmp = diff_match_patch()
+        diffs = dmp.diff_main(encode(original_lines), encode(patched_lines), False)
+        
+        opcodes = []
+        i = j = 0
+        removed = added = 0
+        for op, text in diffs + [(dmp.DIFF_EQUAL, '')]:
+            if op == dmp.DIFF_DELETE:
+                removed += len(text)
+                continue
+            if op == dmp.DIFF_INSERT:
+                added += len(text)
+                continue
+            
+            # Equal run: flush the pending change as a single opcode first
+            if removed or added:
+                tag = 'replace' if removed and added else 'delete' if removed else 'insert'
+                opcodes.append((tag, i, i + removed, j, j + added))
+                i += removed
+                j += added
+                removed = added = 0
+            if text:
+                opcodes.append(('equal', i, i + len(text), j, j + len(text)))
+                i += len(text)
+                j += len(text)
+        
+        return opcodes
+    
     def _parse_hunk_header(self, header_line: str) -> DiffHunk:
         """Parse a hunk header line."""
         # Format: @@ -old_start,old_count +new_start,new_count @@
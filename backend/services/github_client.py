@@ -1,12 +1,35 @@
 import requests
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import os
 import base64
+import random
+import time
+import asyncio
 import logging
+from email.utils import parsedate_to_datetime
 from core.config import config
+from core.analysis_config import api_config
 
 logger = logging.getLogger(__name__)
 
+# Longest wait (seconds) before retrying a transient failure; longer rate-limit resets are not waited out
+MAX_RETRY_DELAY_SECONDS = 32
+
+# File bodies kept for conditional (If-None-Match) requests; the oldest entry is evicted first
+ETAG_CACHE_MAX_ENTRIES = 256
+
+# Files requested per GraphQL query when fetching contents in bulk
+GRAPHQL_FILE_BATCH_SIZE = 50
+
+# Git tree mode for a regular, non-executable file
+REGULAR_FILE_MODE = "100644"
+
+CREATE_COMMIT_ON_BRANCH_MUTATION = """
+mutation($input: CreateCommitOnBranchInput!) {
+  createCommitOnBranch(input: $input) { commit { oid } }
+}
+"""
+
 class GitHubClient:
     def __init__(self):
         self.token = os.getenv("GITHUB_TOKEN")
@@ -17,6 +40,7 @@ class GitHubClient:
             "Accept": "application/vnd.github.v3+json"
         }
         self.base_url = "https://api.github.com"
+        self._etag_cache: Dict[Tuple[str, str], Tuple[str, str]] = {}  # (path, branch) -> (etag, content)
         self._log_configuration()
     
     def _log_configuration(self):
@@ -46,7 +70,7 @@ class GitHubClient:
             params = {"recursive": "1"} if recursive else {}
             
             logger.info(f"Fetching repository tree from branch: {branch}")
-            response = requests.get(url, headers=self.headers, params=params)
+            response = await asyncio.to_thread(requests.get, url, headers=self.headers, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -76,11 +100,24 @@ class GitHubClient:
         
         try:
             url = f"{self.base_url}/repos/{self.repo_owner}/{self.repo_name}/contents/{file_path}"
-            response = requests.get(url, headers=self.headers, params={"ref": branch})
+            cache_key = (file_path, branch)
+            cached = self._etag_cache.get(cache_key)
+            headers = self.headers if cached is None else {**self.headers, "If-None-Match": cached[0]}
+            response = await asyncio.to_thread(requests.get, url, headers=headers, params={"ref": branch})
             
-            if response.status_code == 200:
+            if response.status_code == 304:
+                # Unchanged since the last fetch: no body was sent and the request is not rate-limited
+                logger.info(f"File unchanged, using cached copy: {file_path} from branch: {branch}")
+                return cached[1]
+            elif response.status_code == 200:
                 data = response.json()
                 content = base64.b64decode(data["content"]).decode("utf-8")
+                etag = response.headers.get("ETag")
+                if etag:
+                    self._etag_cache.pop(cache_key, None)  # Re-insert so eviction order follows recency
+                    self._etag_cache[cache_key] = (etag, content)
+                    if len(self._etag_cache) > ETAG_CACHE_MAX_ENTRIES:
+                        del self._etag_cache[next(iter(self._etag_cache))]
                 logger.info(f"Successfully fetched file: {file_path} from branch: {branch}")
                 return content
             elif response.status_code == 404:
@@ -94,6 +131,81 @@ class GitHubClient:
             logger.error(f"Error getting file content for {file_path}: {e}")
             return None
     
+    async def get_files_content(self, file_paths: List[str], branch: str = None) -> Optional[Dict[str, Optional[str]]]:
+        """Fetch several files with batched GraphQL queries; returns None when GraphQL is unavailable.
+        
+        Missing files map to None. Binary or truncated blobs are left out so callers fetch them individually.
+        """
+        if not self._is_configured():
+            logger.warning("GitHub not configured - cannot fetch files")
+            return None
+        
+        # Use configured branch if not specified
+        if branch is None:
+            branch = config.github_target_branch
+        
+        contents = {}
+        try:
+            for batch_start in range(0, len(file_paths), GRAPHQL_FILE_BATCH_SIZE):
+                batch = file_paths[batch_start:batch_start + GRAPHQL_FILE_BATCH_SIZE]
+                # One aliased object lookup per file, with paths passed as variables so they need no escaping
+                declarations = "".join(f", $e{i}: String!" for i in range(len(batch)))
+                lookups = " ".join(
+                    f"f{i}: object(expression: $e{i}) {{ ... on Blob {{ text isBinary isTruncated }} }}"
+                    for i in range(len(batch))
+                )
+                query = f"query($owner: String!, $name: String!{declarations}) {{ repository(owner: $owner, name: $name) {{ {lookups} }} }}"
+                variables = {"owner": self.repo_owner, "name": self.repo_name}
+                variables.update({f"e{i}": f"{branch}:{file_path}" for i, file_path in enumerate(batch)})
+                
+                response = await asyncio.to_thread(requests.post, f"{self.base_url}/graphql", headers=self.headers, json={"query": query, "variables": variables})
+                if response.status_code != 200:
+                    logger.warning(f"⚠️ GraphQL file fetch unavailable: HTTP {response.status_code}")
+                    return None
+                
+                result = response.json()
+                repository = (result.get("data") or {}).get("repository")
+                if result.get("errors") or repository is None:
+                    logger.warning(f"⚠️ GraphQL file fetch failed: {result.get('errors')}")
+                    return None
+                
+                for i, file_path in enumerate(batch):
+                    blob = repository.get(f"f{i}")
+                    if blob is None:
+                        contents[file_path] = None
+                    elif blob.get("text") is not None and not blob.get("isBinary") and not blob.get("isTruncated"):
+                        contents[file_path] = blob["text"]
+            
+            logger.info(f"Successfully fetched {len(contents)} of {len(file_paths)} files from branch: {branch}")
+            return contents
+            
+        except Exception as e:
+            logger.error(f"Error fetching files via GraphQL: {e}")
+            return None
+    
+    async def branch_exists(self, branch: str = None) -> bool:
+        """Check whether a branch exists in the repository"""
+        if not self._is_configured():
+            logger.warning("GitHub not configured - cannot check branch")
+            return False
+        
+        # Use configured branch if not specified
+        if branch is None:
+            branch = config.github_target_branch
+        
+        try:
+            url = f"{self.base_url}/repos/{self.repo_owner}/{self.repo_name}/branches/{branch}"
+            response = await asyncio.to_thread(requests.get, url, headers=self.headers)
+            if response.status_code == 200:
+                return True
+            if response.status_code != 404:
+                logger.error(f"Failed to check branch {branch}: HTTP {response.status_code} - {response.text}")
+            return False
+            
+        except Exception as e:
+            logger.error(f"Error checking branch {branch}: {e}")
+            return False
+    
     async def create_branch(self, branch_name: str, base_branch: str = None) -> bool:
         """Create a new branch"""
         if not self._is_configured():
@@ -107,7 +219,7 @@ class GitHubClient:
         try:
             # Get base branch SHA
             ref_url = f"{self.base_url}/repos/{self.repo_owner}/{self.repo_name}/git/ref/heads/{base_branch}"
-            ref_response = requests.get(ref_url, headers=self.headers)
+            ref_response = await asyncio.to_thread(requests.get, ref_url, headers=self.headers)
             
             if ref_response.status_code != 200:
                 logger.error(f"Failed to get base branch {base_branch}: {ref_response.status_code}")
@@ -122,7 +234,7 @@ class GitHubClient:
                 "sha": base_sha
             }
             
-            response = requests.post(create_url, headers=self.headers, json=create_data)
+            response = await asyncio.to_thread(requests.post, create_url, headers=self.headers, json=create_data)
             if response.status_code == 201:
                 logger.info(f"Successfully created branch: {branch_name}")
                 return True
@@ -134,8 +246,8 @@ class GitHubClient:
             logger.error(f"Error creating branch {branch_name}: {e}")
             return False
     
-    async def commit_file(self, file_path: str, content: str, commit_message: str, branch: str = None) -> bool:
-        """Commit file changes to repository"""
+    async def commit_file(self, file_path: str, content: str, commit_message: str, branch: str = None, base_sha: Optional[str] = None) -> bool:
+        """Commit file changes to repository; base_sha is the blob being replaced, when the caller knows it"""
         if not self._is_configured():
             logger.warning("GitHub not configured - cannot commit file")
             return False
@@ -149,32 +261,36 @@ class GitHubClient:
             logger.info(f"🔧 Repository: {self.repo_owner}/{self.repo_name}")
             logger.info(f"🔧 Commit message: {commit_message}")
             
-            # Get current file SHA if it exists
             file_url = f"{self.base_url}/repos/{self.repo_owner}/{self.repo_name}/contents/{file_path}"
-            logger.info(f"🔍 Checking if file exists: {file_url}")
-            
-            file_response = requests.get(file_url, headers=self.headers, params={"ref": branch})
-            logger.info(f"🔍 File check response: {file_response.status_code}")
-            
             commit_data = {
                 "message": commit_message,
                 "content": base64.b64encode(content.encode("utf-8")).decode("utf-8"),
                 "branch": branch
             }
             
-            if file_response.status_code == 200:
-                # File exists, include SHA for update
-                file_data = file_response.json()
-                commit_data["sha"] = file_data["sha"]
-                logger.info(f"📝 File {file_path} exists, updating with SHA: {file_data['sha'][:8]}...")
-            elif file_response.status_code == 404:
-                logger.info(f"📝 File {file_path} does not exist, creating new file")
+            if base_sha is not None:
+                # Skip re-downloading the file just to learn its SHA; GitHub rejects the update if it changed
+                commit_data["sha"] = base_sha
+                logger.info(f"📝 Updating {file_path} from known SHA: {base_sha[:8]}...")
             else:
-                logger.warning(f"⚠️ Unexpected response when checking file existence: {file_response.status_code}")
-                logger.warning(f"⚠️ Response: {file_response.text}")
+                # Get current file SHA if it exists
+                logger.info(f"🔍 Checking if file exists: {file_url}")
+                file_response = await asyncio.to_thread(requests.get, file_url, headers=self.headers, params={"ref": branch})
+                logger.info(f"🔍 File check response: {file_response.status_code}")
+                
+                if file_response.status_code == 200:
+                    # File exists, include SHA for update
+                    file_data = file_response.json()
+                    commit_data["sha"] = file_data["sha"]
+                    logger.info(f"📝 File {file_path} exists, updating with SHA: {file_data['sha'][:8]}...")
+                elif file_response.status_code == 404:
+                    logger.info(f"📝 File {file_path} does not exist, creating new file")
+                else:
+                    logger.warning(f"⚠️ Unexpected response when checking file existence: {file_response.status_code}")
+                    logger.warning(f"⚠️ Response: {file_response.text}")
             
             logger.info(f"🔧 Sending commit request for {file_path} to {self.base_url}")
-            response = requests.put(file_url, headers=self.headers, json=commit_data)
+            response = await self._put_with_retry(file_url, commit_data)
             
             logger.info(f"🔧 Commit response status: {response.status_code}")
             
@@ -205,6 +321,191 @@ class GitHubClient:
             logger.error(f"❌ Error committing file {file_path}: {e}")
             return False
     
+    async def _put_with_retry(self, url: str, data: Dict[str, Any]) -> requests.Response:
+        """PUT with exponential backoff on rate limits and server errors"""
+        for attempt in range(api_config.github_max_retries + 1):
+            response = await asyncio.to_thread(requests.put, url, headers=self.headers, json=data)
+            delay = self._retry_delay(response, attempt)
+            if delay is None or attempt == api_config.github_max_retries:
+                return response
+            logger.warning(f"⚠️ GitHub returned HTTP {response.status_code}, retrying in {delay:.1f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+        return response
+    
+    def _retry_delay(self, response: requests.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a failed request, or None when retrying cannot help"""
+        status = response.status_code
+        backoff = min(2 ** attempt + random.random(), MAX_RETRY_DELAY_SECONDS)
+        if status >= 500:
+            return backoff
+        if status not in (403, 429):
+            return None  # Other client errors (e.g. a 409 SHA conflict) fail the same way every time
+        
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            delay = self._parse_retry_after(retry_after, backoff)
+        elif response.headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                delay = float(response.headers.get("X-RateLimit-Reset", 0)) - time.time()
+            except ValueError:
+                delay = backoff
+        elif status == 429:
+            delay = backoff
+        else:
+            return None  # A plain 403 is a permissions problem, not a rate limit
+        return max(delay, 0.0) if delay <= MAX_RETRY_DELAY_SECONDS else None
+    
+    def _parse_retry_after(self, retry_after: str, default: float) -> float:
+        """Seconds from a Retry-After header, which is either delay-seconds or an HTTP-date"""
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+        try:
+            return parsedate_to_datetime(retry_after).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return default
+    
+    async def commit_files(self, files: Dict[str, str], commit_message: str, branch: str = None, base_shas: Optional[Dict[str, str]] = None) -> bool:
+        """Commit several files to a branch as a single commit, via GraphQL with a git data API fallback
+        
+        base_shas maps paths to the blob each change was made against; the commit is refused if any file has moved on.
+        """
+        if not self._is_configured():
+            logger.warning("GitHub not configured - cannot commit files")
+            return False
+        
+        # Use configured branch if not specified
+        if branch is None:
+            branch = config.github_target_branch
+        
+        try:
+            repo_url = f"{self.base_url}/repos/{self.repo_owner}/{self.repo_name}"
+            logger.info(f"🔧 Starting batched commit of {len(files)} files to branch {branch}")
+            
+            # Resolve the branch head and its tree
+            ref_response = await asyncio.to_thread(requests.get, f"{repo_url}/git/ref/heads/{branch}", headers=self.headers)
+            if ref_response.status_code != 200:
+                logger.error(f"❌ Failed to get branch {branch}: HTTP {ref_response.status_code}")
+                return False
+            head_sha = ref_response.json()["object"]["sha"]
+            
+            commit_response = await asyncio.to_thread(requests.get, f"{repo_url}/git/commits/{head_sha}", headers=self.headers)
+            if commit_response.status_code != 200:
+                logger.error(f"❌ Failed to get head commit {head_sha[:8]}: HTTP {commit_response.status_code}")
+                return False
+            base_tree_sha = commit_response.json()["tree"]["sha"]
+            
+            # Both commit paths below are pinned to head_sha, so this tree is exactly what the commit builds on
+            tree_response = await asyncio.to_thread(
+                requests.get, f"{repo_url}/git/trees/{base_tree_sha}", headers=self.headers, params={"recursive": "1"}
+            )
+            if tree_response.status_code != 200:
+                logger.error(f"❌ Failed to get tree {base_tree_sha[:8]}: HTTP {tree_response.status_code}")
+                return False
+            base_tree = tree_response.json()
+            existing = {item["path"]: item for item in base_tree.get("tree", []) if item.get("type") == "blob"}
+            
+            modes = {}
+            for file_path in files:
+                item = existing.get(file_path)
+                if item is None and base_tree.get("truncated"):
+                    # The file may exist past the truncation point; per-file commits can still handle it
+                    logger.warning(f"⚠️ Tree listing truncated, cannot resolve {file_path} for a batched commit")
+                    return False
+                expected_sha = (base_shas or {}).get(file_path)
+                if expected_sha is not None and (item is None or item["sha"] != expected_sha):
+                    logger.error(f"❌ {file_path} changed on {branch} since it was patched, refusing to overwrite it")
+                    return False
+                # Keep executable bits and symlinks; only new files get the regular file mode
+                modes[file_path] = item["mode"] if item is not None else REGULAR_FILE_MODE
+            
+            # One GraphQL mutation covers every file, but it cannot set modes, so it only handles regular files
+            if all(mode == REGULAR_FILE_MODE for mode in modes.values()):
+                commit_sha = await self._create_commit_on_branch(files, commit_message, branch, head_sha)
+                if commit_sha:
+                    logger.info(f"✅ Successfully committed {len(files)} files to branch: {branch}")
+                    logger.info(f"✅ Commit SHA: {commit_sha[:8]}...")
+                    return True
+            
+            # Inline contents in the tree so no separate blob requests are needed
+            tree_data = {
+                "base_tree": base_tree_sha,
+                "tree": [
+                    {"path": file_path, "mode": modes[file_path], "type": "blob", "content": content}
+                    for file_path, content in files.items()
+                ]
+            }
+            tree_response = await asyncio.to_thread(requests.post, f"{repo_url}/git/trees", headers=self.headers, json=tree_data)
+            if tree_response.status_code != 201:
+                logger.error(f"❌ Failed to create tree: HTTP {tree_response.status_code} - {tree_response.text}")
+                return False
+            
+            new_commit_data = {
+                "message": commit_message,
+                "tree": tree_response.json()["sha"],
+                "parents": [head_sha]
+            }
+            new_commit_response = await asyncio.to_thread(requests.post, f"{repo_url}/git/commits", headers=self.headers, json=new_commit_data)
+            if new_commit_response.status_code != 201:
+                logger.error(f"❌ Failed to create commit: HTTP {new_commit_response.status_code} - {new_commit_response.text}")
+                return False
+            commit_sha = new_commit_response.json()["sha"]
+            
+            # Fast-forward only, so a concurrent push makes this fail instead of being overwritten
+            update_response = await asyncio.to_thread(
+                requests.patch,
+                f"{repo_url}/git/refs/heads/{branch}", headers=self.headers, json={"sha": commit_sha, "force": False}
+            )
+            if update_response.status_code != 200:
+                logger.error(f"❌ Failed to update branch {branch}: HTTP {update_response.status_code} - {update_response.text}")
+                return False
+            
+            logger.info(f"✅ Successfully committed {len(files)} files to branch: {branch}")
+            logger.info(f"✅ Commit SHA: {commit_sha[:8]}...")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Error committing files to {branch}: {e}")
+            return False
+    
+    async def _create_commit_on_branch(self, files: Dict[str, str], commit_message: str, branch: str, head_sha: str) -> Optional[str]:
+        """Create one commit with all files through GraphQL createCommitOnBranch; returns its sha or None"""
+        headline, _, body = commit_message.partition("\n")
+        commit_input = {
+            "branch": {"repositoryNameWithOwner": f"{self.repo_owner}/{self.repo_name}", "branchName": branch},
+            "message": {"headline": headline, "body": body.strip()},
+            # Rejected if the branch moved since head_sha was read, like a non-forced ref update
+            "expectedHeadOid": head_sha,
+            "fileChanges": {
+                "additions": [
+                    {"path": file_path, "contents": base64.b64encode(content.encode("utf-8")).decode("ascii")}
+                    for file_path, content in files.items()
+                ]
+            }
+        }
+        
+        try:
+            response = await asyncio.to_thread(
+                requests.post,
+                f"{self.base_url}/graphql",
+                headers=self.headers,
+                json={"query": CREATE_COMMIT_ON_BRANCH_MUTATION, "variables": {"input": commit_input}}
+            )
+            if response.status_code != 200:
+                logger.warning(f"⚠️ GraphQL commit unavailable: HTTP {response.status_code}, using git data API")
+                return None
+            
+            result = response.json()
+            if result.get("errors"):
+                logger.warning(f"⚠️ GraphQL commit failed: {result['errors'][0].get('message')}, using git data API")
+                return None
+            return result["data"]["createCommitOnBranch"]["commit"]["oid"]
+            
+        except Exception as e:
+            logger.warning(f"⚠️ GraphQL commit error: {e}, using git data API")
+            return None
+    
     async def create_pull_request(self, title: str, body: str, head_branch: str, base_branch: str = None) -> Optional[Dict]:
         """Create a pull request"""
         if not self._is_configured():
@@ -224,7 +525,7 @@ class GitHubClient:
                 "base": base_branch
             }
             
-            response = requests.post(pr_url, headers=self.headers, json=pr_data)
+            response = await asyncio.to_thread(requests.post, pr_url, headers=self.headers, json=pr_data)
             
             if response.status_code == 201:
                 logger.info(f"Successfully created pull request: {title}")
@@ -1,3 +1,4 @@
+import ast
 import subprocess
 import tempfile
 import os
@@ -257,9 +258,9 @@ class LintRunner:
                 if len(line) > 120:
                     warnings.append(f"Line {i+1}: Line too long ({len(line)} chars)")
             
-            # Check for syntax
+            # Check for syntax (parse only; no bytecode is needed to find syntax errors)
             try:
-                compile(content, file_path, 'exec')
+                ast.parse(content, filename=file_path)
             except SyntaxError as e:
                 issues.append(f"Syntax error: {e}")
             
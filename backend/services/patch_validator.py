@@ -2,11 +2,55 @@
 import ast
 import json
 import re
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Line prefixes a unified diff must contain, paired with the same prefix as it appears after a newline
+UNIFIED_DIFF_LINE_MARKERS = tuple((marker, '\n' + marker) for marker in ('--- ', '+++ ', '@@'))
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Matches the marker of every added or removed line in a unified diff
+CHANGE_LINE_PATTERN = re.compile(r'\n([+-])')
+FROM_IMPORT_PATTERN = re.compile(r'from\s+(\S+)\s+import\s+(.+)')
+
+# Any conflict marker or diff header left behind in patched content
+CONFLICT_MARKERS = ('<<<<<<<', '=======', '>>>>>>>')
+DIFF_HEADER_MARKERS = ('--- a/', '+++ b/')
+PATCH_ARTIFACT_PATTERN = re.compile('|'.join(map(re.escape, CONFLICT_MARKERS + DIFF_HEADER_MARKERS)))
+
+# Search/replace edit blocks: <<<<<<< SEARCH / ======= / >>>>>>> REPLACE
+SEARCH_REPLACE_MARKER = "<<<<<<< SEARCH"
+SEARCH_REPLACE_PATTERN = re.compile(
+    r'^<<<<<<< SEARCH\n(.*?)^=======\n(.*?)^>>>>>>> REPLACE$', re.MULTILINE | re.DOTALL
+)
+
+def is_search_replace_patch(patch_content: str) -> bool:
+    """Whether a patch is search/replace blocks rather than a unified diff that merely mentions the marker"""
+    return patch_content.startswith(SEARCH_REPLACE_MARKER) and '\n@@' not in patch_content
+
+@lru_cache(maxsize=4096)
+def _normalize_import_line(import_line: str) -> str:
+    """Normalize an import statement, memoized since the same imports recur across files"""
+    # Remove extra whitespace and standardize format
+    normalized = WHITESPACE_PATTERN.sub(' ', import_line.strip())
+    
+    # Handle different import formats consistently
+    if normalized.startswith('from '):
+        # Sort imported names for consistent comparison
+        match = FROM_IMPORT_PATTERN.match(normalized)
+        if match:
+            module, imports = match.groups()
+            # Sort individual imports
+            import_list = [imp.strip() for imp in imports.split(',')]
+            import_list.sort()
+            normalized = f"from {module} import {', '.join(import_list)}"
+    
+    return normalized
+
 class PatchValidator:
     """Validate patches before and after application with comprehensive checks."""
     
@@ -29,7 +73,10 @@ class PatchValidator:
             
             # Validate patch content format
             patch_content = patch_data.get('patch_content', '')
-            if not self._is_valid_unified_diff(patch_content):
+            if is_search_replace_patch(patch_content):
+                if not SEARCH_REPLACE_PATTERN.search(patch_content):
+                    return False, "Invalid search/replace block format"
+            elif not self._is_valid_unified_diff(patch_content):
                 return False, "Invalid unified diff format"
             
             # Validate confidence score
@@ -73,14 +120,12 @@ class PatchValidator:
         if not patch_content.strip():
             return False
         
-        lines = patch_content.split('\n')
-        
-        # Check for diff headers
-        has_from_file = any(line.startswith('--- ') for line in lines)
-        has_to_file = any(line.startswith('+++ ') for line in lines)
-        has_hunk_header = any(line.startswith('@@') for line in lines)
-        
-        return has_from_file and has_to_file and has_hunk_header
+        # A line starts with a marker iff the content starts with it or it follows a newline, so
+        # substring searches (which stop at the first hit) replace splitting and scanning every line
+        return all(
+            patch_content.startswith(marker) or line_marker in patch_content
+            for marker, line_marker in UNIFIED_DIFF_LINE_MARKERS
+        )
     
     def _validate_python_syntax(self, content: str, file_path: str) -> Tuple[bool, Optional[str]]:
         """Validate Python syntax."""
@@ -131,11 +176,14 @@ class PatchValidator:
         """Detect common patch application artifacts with improved duplicate detection."""
         issues = []
         
+        # One scan for every marker; the per-marker checks below only run when something was found
+        has_artifacts = PATCH_ARTIFACT_PATTERN.search(content) is not None
+        
         # Check for conflict markers
-        conflict_markers = ['<<<<<<<', '=======', '>>>>>>>']
-        for marker in conflict_markers:
-            if marker in content:
-                issues.append(f"Conflict marker found: {marker}")
+        if has_artifacts:
+            for marker in CONFLICT_MARKERS:
+                if marker in content:
+                    issues.append(f"Conflict marker found: {marker}")
         
         # Improved duplicate imports detection
         import_issues = self._detect_duplicate_imports(content)
@@ -143,58 +191,35 @@ class PatchValidator:
             issues.extend(import_issues)
         
         # Check for malformed diff headers in content
-        if '--- a/' in content or '+++ b/' in content:
+        if has_artifacts and any(marker in content for marker in DIFF_HEADER_MARKERS):
             issues.append("Diff headers found in file content")
         
         return issues
     
     def _detect_duplicate_imports(self, content: str) -> List[str]:
         """Detect duplicate import statements with more sophisticated logic."""
-        lines = content.split('\n')
-        import_statements = []
         issues = []
+        seen_imports = set()
         
-        # Extract import statements
-        for line_num, line in enumerate(lines, 1):
+        # Extract and check import statements in one pass, stopping at the first duplicate
+        for line_num, line in enumerate(content.split('\n'), 1):
+            if 'import ' not in line:  # Cheap C-level filter; both import forms contain it
+                continue
             stripped_line = line.strip()
             if (stripped_line.startswith('import ') or 
                 stripped_line.startswith('from ') and ' import ' in stripped_line):
-                import_statements.append({
-                    'line': line_num,
-                    'content': stripped_line,
-                    'normalized': self._normalize_import(stripped_line)
-                })
-        
-        # Check for duplicates
-        seen_imports = set()
-        for import_stmt in import_statements:
-            normalized = import_stmt['normalized']
-            if normalized in seen_imports:
-                logger.debug(f"Duplicate import detected at line {import_stmt['line']}: {import_stmt['content']}")
-                issues.append("Duplicate import statements detected")
-                break
-            else:
+                normalized = self._normalize_import(stripped_line)
+                if normalized in seen_imports:
+                    logger.debug(f"Duplicate import detected at line {line_num}: {stripped_line}")
+                    issues.append("Duplicate import statements detected")
+                    break
                 seen_imports.add(normalized)
         
         return issues
     
     def _normalize_import(self, import_line: str) -> str:
         """Normalize import statement for comparison."""
-        # Remove extra whitespace and standardize format
-        normalized = re.sub(r'\s+', ' ', import_line.strip())
-        
-        # Handle different import formats consistently
-        if normalized.startswith('from '):
-            # Sort imported names for consistent comparison
-            match = re.match(r'from\s+(\S+)\s+import\s+(.+)', normalized)
-            if match:
-                module, imports = match.groups()
-                # Sort individual imports
-                import_list = [imp.strip() for imp in imports.split(',')]
-                import_list.sort()
-                normalized = f"from {module} import {', '.join(import_list)}"
-        
-        return normalized
+        return _normalize_import_line(import_line)
     
     def _get_file_extension(self, file_path: str) -> str:
         """Get file extension from path."""
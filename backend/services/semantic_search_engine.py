@@ -293,8 +293,12 @@ class SemanticSearchEngine:
     
     def _get_chunk_hash(self, chunk: CodeChunk) -> str:
         """Generate hash for chunk caching."""
-        content = f"{chunk.file_path}:{chunk.content}"
-        return hashlib.md5(content.encode()).hexdigest()
+        # Non-cryptographic cache key: hash the parts incrementally instead of building one joined string
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(chunk.file_path.encode())
+        hasher.update(b":")
+        hasher.update(chunk.content.encode())
+        return hasher.hexdigest()
     
     async def search_similar_code(self, query: str, max_results: int = 10, 
                                  similarity_threshold: float = 0.7) -> List[Tuple[CodeChunk, float]]:
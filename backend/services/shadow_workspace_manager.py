@@ -2,6 +2,7 @@ import os
 import shutil
 import tempfile
 import asyncio
+import itertools
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 import logging
@@ -14,11 +15,12 @@ class ShadowWorkspaceManager:
     def __init__(self):
         self.active_workspaces = {}
         self.cleanup_tasks = []
+        self._workspace_counter = itertools.count()  # Keeps ids unique for identical content
     
     async def create_shadow_workspace(self, file_path: str, original_content: str, patched_content: str) -> str:
         """Create an isolated shadow workspace for validation."""
         try:
-            workspace_id = f"shadow_{hash(f'{file_path}_{original_content[:100]}')}"
+            workspace_id = f"shadow_{hash(f'{file_path}_{original_content[:100]}')}_{next(self._workspace_counter)}"
             workspace_dir = tempfile.mkdtemp(prefix=f"shadow_validation_{workspace_id}_")
             
             logger.info(f"🏗️ Creating shadow workspace: {workspace_dir}")
@@ -45,6 +47,9 @@ class ShadowWorkspaceManager:
                 'file_path': file_path,
                 'shadow_file_path': shadow_file_path,
                 'original_file_path': original_file_path,
+                # Kept in memory so validation and diffing do not read the files back from disk
+                'patched_content': patched_content,
+                'original_content': original_content,
                 'created_at': asyncio.get_event_loop().time()
             }
             
@@ -72,12 +77,8 @@ class ShadowWorkspaceManager:
             from services.validation_orchestrator import ValidationOrchestrator
             validator = ValidationOrchestrator()
             
-            # Read patched and original content
-            with open(workspace['shadow_file_path'], 'r', encoding='utf-8') as f:
-                patched_content = f.read()
-            
-            with open(workspace['original_file_path'], 'r', encoding='utf-8') as f:
-                original_content = f.read()
+            patched_content = workspace['patched_content']
+            original_content = workspace['original_content']
             
             # Run comprehensive validation
             validation_summary = await validator.validate_patch(
@@ -123,12 +124,8 @@ class ShadowWorkspaceManager:
         workspace = self.active_workspaces[workspace_id]
         
         try:
-            # Read content
-            with open(workspace['shadow_file_path'], 'r', encoding='utf-8') as f:
-                patched_content = f.read()
-            
-            with open(workspace['original_file_path'], 'r', encoding='utf-8') as f:
-                original_content = f.read()
+            patched_content = workspace['patched_content']
+            original_content = workspace['original_content']
             
             # Generate diff using DiffPresenter
             from services.diff_presenter import DiffPresenter
@@ -230,11 +230,11 @@ class TypeChecker:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # Check for type annotations
+            # Check for type annotations, reusing the orchestrator's parse of the same patched content
             import ast
-            try:
-                tree = ast.parse(content)
-                
+            from services.validation_orchestrator import parse_python_source
+            tree, syntax_error = parse_python_source(content)
+            if syntax_error is None:
                 # Count functions with/without type annotations
                 functions_with_annotations = 0
                 total_functions = 0
@@ -256,8 +256,7 @@ class TypeChecker:
                     annotation_ratio = functions_with_annotations / total_functions
                     if annotation_ratio < 0.5:
                         warnings.append(f"Low type annotation coverage: {annotation_ratio:.1%}")
-                
-            except SyntaxError:
+            else:
                 issues.append("Syntax error prevents type analysis")
             
             return {
@@ -1,14 +1,24 @@
+import ast
 import asyncio
 import tempfile
 import shutil
 import os
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=16)
+def parse_python_source(content: str) -> Tuple[Optional[ast.Module], Optional[str]]:
+    """Parse Python source once per distinct content; the syntax and import checks share the tree"""
+    try:
+        return ast.parse(content), None
+    except SyntaxError as e:
+        return None, str(e)  # Keep the message only so the cache does not pin traceback frames
+
 @dataclass
 class ValidationResult:
     """Result of a validation check."""
@@ -228,11 +238,9 @@ class ValidationOrchestrator:
         try:
             if file_path.endswith('.py'):
                 # Python syntax validation
-                import ast
-                try:
-                    ast.parse(content)
-                except SyntaxError as e:
-                    issues.append(f"Python syntax error: {e}")
+                _, error = parse_python_source(content)
+                if error is not None:
+                    issues.append(f"Python syntax error: {error}")
                     success = False
             
             elif file_path.endswith(('.js', '.ts', '.tsx', '.jsx')):
@@ -322,9 +330,8 @@ class ValidationOrchestrator:
         
         try:
             if file_path.endswith('.py'):
-                import ast
-                try:
-                    tree = ast.parse(content)
+                tree, error = parse_python_source(content)
+                if error is None:
                     imports = []
                     
                     for node in ast.walk(tree):
@@ -344,10 +351,7 @@ class ValidationOrchestrator:
                         simple_name = imp.split('.')[0]
                         if simple_name not in content:
                             warnings.append(f"Potentially unused import: {imp}")
-                
-                except SyntaxError:
-                    # Already caught in syntax validation
-                    pass
+                # Syntax errors are already reported by the syntax validation
             
         except Exception as e:
             issues.append(f"Import validation error: {e}")